@@ -1,14 +1,11 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import numpy as np
 from datetime import datetime, timedelta, date
-import json
-import base64
-from abc import ABC, abstractmethod
-import re
+from dataclasses import dataclass, field
+from collections import Counter, namedtuple
+import uuid
+import orjson
 
 st.set_page_config(
     page_title="🥗 Advanced Nutrition Tracker",
@@ -61,73 +58,45 @@ st.markdown("""
         border-radius: 5px;
         margin: 1rem 0;
     }
-</style>
-""", unsafe_allow_html=True)
-
-class FoodItem(ABC):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0):
-        self.name = name
-        self.calories_per_100g = calories_per_100g
-        self.protein = protein
-        self.carbs = carbs
-        self.fat = fat
-        self.fiber = fiber
-        self.sugar = sugar
-    
-    @abstractmethod
-    def get_category(self):
-        pass
-    
-    def calculate_nutrition(self, serving_size_g):
-        multiplier = serving_size_g / 100
-        return {
-            'calories': self.calories_per_100g * multiplier,
-            'protein': self.protein * multiplier,
-            'carbs': self.carbs * multiplier,
-            'fat': self.fat * multiplier,
-            'fiber': self.fiber * multiplier,
-            'sugar': self.sugar * multiplier
-        }
-
-class Fruit(FoodItem):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0, vitamin_c=0):
-        super().__init__(name, calories_per_100g, protein, carbs, fat, fiber, sugar)
-        self.vitamin_c = vitamin_c
     
-    def get_category(self):
-        return "🍎 Fruits"
-
-class Vegetable(FoodItem):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0, iron=0):
-        super().__init__(name, calories_per_100g, protein, carbs, fat, fiber, sugar)
-        self.iron = iron
+    .target-progress {
+        margin: 0.5rem 0 1rem 0;
+    }
     
-    def get_category(self):
-        return "🥬 Vegetables"
-
-class Protein(FoodItem):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0, is_lean=True):
-        super().__init__(name, calories_per_100g, protein, carbs, fat, fiber, sugar)
-        self.is_lean = is_lean
+    .target-progress-track {
+        background-color: #f0f2f6;
+        border-radius: 5px;
+        height: 0.5rem;
+        overflow: hidden;
+    }
     
-    def get_category(self):
-        return "🍗 Proteins"
-
-class Grain(FoodItem):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0, is_whole_grain=False):
-        super().__init__(name, calories_per_100g, protein, carbs, fat, fiber, sugar)
-        self.is_whole_grain = is_whole_grain
+    .target-progress-fill {
+        background-color: #ff4b4b;
+        height: 100%;
+    }
     
-    def get_category(self):
-        return "🌾 Grains"
+    .target-progress-caption {
+        color: rgba(49, 51, 63, 0.6);
+        font-size: 0.875rem;
+    }
+</style>
+""", unsafe_allow_html=True)
 
-class Dairy(FoodItem):
-    def __init__(self, name, calories_per_100g, protein, carbs, fat, fiber=0, sugar=0, calcium=0):
-        super().__init__(name, calories_per_100g, protein, carbs, fat, fiber, sugar)
-        self.calcium = calcium
-    
-    def get_category(self):
-        return "🥛 Dairy"
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fat', 'fiber', 'sugar')
+
+Nutrition = namedtuple('Nutrition', NUTRIENTS)
+
+@dataclass(slots=True, frozen=True)
+class FoodItem:
+    name: str
+    category: str
+    calories_per_100g: float
+    protein: float
+    carbs: float
+    fat: float
+    fiber: float = 0
+    sugar: float = 0
+    extra: float = 0.0
 
 class NutritionError(Exception):
     pass
@@ -138,13 +107,109 @@ class InvalidServingSizeError(NutritionError):
 class InvalidGoalError(NutritionError):
     pass
 
+CALORIES, PROTEIN, CARBS, FAT, FIBER, SUGAR = range(len(NUTRIENTS))
+
+def _object_column():
+    return np.empty(0, dtype=object)
+
+def _nutrition_matrix():
+    return np.zeros((0, len(NUTRIENTS)), dtype=np.float32)
+
+@dataclass(slots=True)
+class DailyLog:
+    time: np.ndarray = field(default_factory=_object_column)
+    meal: np.ndarray = field(default_factory=_object_column)
+    food_name: np.ndarray = field(default_factory=_object_column)
+    serving_size: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    nutrition: np.ndarray = field(default_factory=_nutrition_matrix)
+    
+    def __len__(self):
+        return len(self.food_name)
+    
+    def append(self, time, meal, food_name, serving_size, nutrition_row):
+        self.time = np.append(self.time, np.array([time], dtype=object))
+        self.meal = np.append(self.meal, np.array([meal], dtype=object))
+        self.food_name = np.append(self.food_name, np.array([food_name], dtype=object))
+        self.serving_size = np.append(self.serving_size, np.float32(serving_size))
+        self.nutrition = np.append(self.nutrition, np.asarray(nutrition_row, dtype=np.float32).reshape(1, -1), axis=0)
+    
+    def remove(self, index):
+        for column in ('time', 'meal', 'food_name', 'serving_size'):
+            setattr(self, column, np.delete(getattr(self, column), index))
+        self.nutrition = np.delete(self.nutrition, index, axis=0)
+    
+    def totals(self):
+        return self.nutrition.sum(axis=0, dtype=np.float64)
+    
+    def to_dict(self):
+        return {
+            'time': self.time.tolist(),
+            'meal': self.meal.tolist(),
+            'food_name': self.food_name.tolist(),
+            'serving_size': self.serving_size,
+            'nutrition': self.nutrition
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            time=np.array(data['time'], dtype=object),
+            meal=np.array(data['meal'], dtype=object),
+            food_name=np.array(data['food_name'], dtype=object),
+            serving_size=np.asarray(data['serving_size'], dtype=np.float32),
+            nutrition=np.asarray(data['nutrition'], dtype=np.float32).reshape(-1, len(NUTRIENTS))
+        )
+    
+    @classmethod
+    def from_records(cls, records):
+        log = cls()
+        for record in records:
+            log.append(record['time'], record.get('meal', 'Snack'), record['food_name'],
+                       record['serving_size'], [record['nutrition'][n] for n in NUTRIENTS])
+        return log
+
+def sum_by_day(day_ids, rows, n_days):
+    out = np.zeros((n_days, rows.shape[1]), dtype=np.float32)
+    np.add.at(out, day_ids, rows)
+    return out
+
+def compute_streak(daily_calories, target):
+    streak = 0
+    low = 0.9 * target
+    high = 1.1 * target
+    for i in range(daily_calories.size):
+        if low <= daily_calories[i] <= high:
+            streak += 1
+        else:
+            return streak
+    return streak
+
 def initialize_session_state():
     if 'food_database' not in st.session_state:
-        st.session_state.food_database = create_food_database()
+        st.session_state.food_database = dict(create_food_database())
+    
+    if 'category_counts' not in st.session_state:
+        st.session_state.category_counts = Counter(food.category for food in st.session_state.food_database.values())
+    
+    if 'food_index' not in st.session_state:
+        st.session_state.food_index = load_food_index()
+    
+    if 'nutrition_matrix' not in st.session_state:
+        st.session_state.nutrition_matrix = load_nutrition_matrix()
+        st.session_state.food_ids = {name: i for i, name in enumerate(st.session_state.food_index['name'])}
+    
+    if 'db_version' not in st.session_state:
+        st.session_state.db_version = 0
     
     if 'daily_entries' not in st.session_state:
         st.session_state.daily_entries = {}
     
+    if 'entries_version' not in st.session_state:
+        st.session_state.entries_version = 0
+    
+    if 'session_key' not in st.session_state:
+        st.session_state.session_key = uuid.uuid4().hex
+    
     if 'user_profile' not in st.session_state:
         st.session_state.user_profile = {
             'name': 'User',
@@ -166,6 +231,7 @@ def initialize_session_state():
             'sleep_hours': 8
         }
 
+@st.cache_resource
 def create_food_database():
     foods = {}
     
@@ -179,7 +245,7 @@ def create_food_database():
     ]
     
     for name, cal, prot, carb, fat, fib, sug, vit_c in fruits_data:
-        foods[name] = Fruit(name, cal, prot, carb, fat, fib, sug, vit_c)
+        foods[name] = FoodItem(name, "🍎 Fruits", cal, prot, carb, fat, fib, sug, vit_c)
     
     vegetables_data = [
         ("Broccoli", 34, 2.8, 7, 0.4, 2.6, 1.5, 1.8),
@@ -191,7 +257,7 @@ def create_food_database():
     ]
     
     for name, cal, prot, carb, fat, fib, sug, iron in vegetables_data:
-        foods[name] = Vegetable(name, cal, prot, carb, fat, fib, sug, iron)
+        foods[name] = FoodItem(name, "🥬 Vegetables", cal, prot, carb, fat, fib, sug, iron)
     
     proteins_data = [
         ("Chicken Breast", 165, 31, 0, 3.6, 0, 0, True),
@@ -203,7 +269,7 @@ def create_food_database():
     ]
     
     for name, cal, prot, carb, fat, fib, sug, lean in proteins_data:
-        foods[name] = Protein(name, cal, prot, carb, fat, fib, sug, lean)
+        foods[name] = FoodItem(name, "🍗 Proteins", cal, prot, carb, fat, fib, sug, float(lean))
     
     grains_data = [
         ("Brown Rice", 111, 2.6, 23, 0.9, 1.8, 0.4, True),
@@ -215,7 +281,7 @@ def create_food_database():
     ]
     
     for name, cal, prot, carb, fat, fib, sug, whole in grains_data:
-        foods[name] = Grain(name, cal, prot, carb, fat, fib, sug, whole)
+        foods[name] = FoodItem(name, "🌾 Grains", cal, prot, carb, fat, fib, sug, float(whole))
     
     dairy_data = [
         ("Milk (2%)", 50, 3.4, 5, 2, 0, 5, 120),
@@ -226,10 +292,87 @@ def create_food_database():
     ]
     
     for name, cal, prot, carb, fat, fib, sug, calcium in dairy_data:
-        foods[name] = Dairy(name, cal, prot, carb, fat, fib, sug, calcium)
+        foods[name] = FoodItem(name, "🥛 Dairy", cal, prot, carb, fat, fib, sug, calcium)
     
     return foods
 
+CATEGORIES = ("🍎 Fruits", "🥬 Vegetables", "🍗 Proteins", "🌾 Grains", "🥛 Dairy")
+
+def create_food_index(foods):
+    names = list(foods)
+    return pd.DataFrame({
+        'name': names,
+        'name_lc': [name.lower() for name in names],
+        'category': [foods[name].category for name in names]
+    })
+
+@st.cache_data
+def load_food_index():
+    return create_food_index(create_food_database())
+
+def create_nutrition_matrix(foods):
+    return np.array([
+        [food.calories_per_100g, food.protein, food.carbs, food.fat, food.fiber, food.sugar]
+        for food in foods.values()
+    ], dtype=np.float32).reshape(-1, len(NUTRIENTS))
+
+@st.cache_data
+def load_nutrition_matrix():
+    return create_nutrition_matrix(create_food_database())
+
+def food_category_map():
+    key = st.session_state.db_version
+    cached = st.session_state.get('_category_map_cache')
+    if cached is None or cached[0] != key:
+        food_index = st.session_state.food_index
+        cached = (key, dict(zip(food_index['name'], food_index['category'])))
+        st.session_state['_category_map_cache'] = cached
+    return cached[1]
+
+def nutrition_for(food_id, serving_size_g):
+    return st.session_state.nutrition_matrix[food_id] * np.float32(serving_size_g * 0.01)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def compute_daily_totals(session_key, entries_version, dates, _logs):
+    day_ids = np.repeat(np.arange(len(dates)), [len(log) for log in _logs])
+    rows = np.concatenate([log.nutrition for log in _logs])
+    return pd.DataFrame(sum_by_day(day_ids, rows, len(dates)), index=dates, columns=NUTRIENTS)
+
+def _today_totals():
+    today = datetime.now().strftime("%Y-%m-%d")
+    key = (today, st.session_state.entries_version)
+    cache = st.session_state.setdefault('_totals_cache', {})
+    if key not in cache:
+        cache.clear()
+        log = st.session_state.daily_entries.get(today)
+        cache[key] = log.totals() if log is not None else np.zeros(len(NUTRIENTS))
+    return cache[key]
+
+def _food_log_df(today, log):
+    key = (today, st.session_state.entries_version)
+    cached = st.session_state.get('_food_df_cache')
+    if cached is None or cached[0] != key:
+        food_df = pd.DataFrame({
+            'Time': log.time,
+            'Food': log.food_name,
+            'Serving (g)': log.serving_size,
+            'Calories': log.nutrition[:, CALORIES],
+            'Protein (g)': log.nutrition[:, PROTEIN],
+            'Carbs (g)': log.nutrition[:, CARBS],
+            'Fat (g)': log.nutrition[:, FAT]
+        })
+        cached = (key, food_df)
+        st.session_state['_food_df_cache'] = cached
+    return cached[1]
+
+ACTIVITY_MULTIPLIERS = {
+    "Sedentary": 1.2,
+    "Light": 1.375,
+    "Moderate": 1.55,
+    "Active": 1.725,
+    "Very Active": 1.9
+}
+
 def calculate_bmr(weight, height, age, gender):
     if gender == "Male":
         bmr = 10 * weight + 6.25 * height - 5 * age + 5
@@ -238,14 +381,42 @@ def calculate_bmr(weight, height, age, gender):
     return bmr
 
 def calculate_daily_calories(bmr, activity_level):
-    activity_multipliers = {
-        "Sedentary": 1.2,
-        "Light": 1.375,
-        "Moderate": 1.55,
-        "Active": 1.725,
-        "Very Active": 1.9
+    return int(bmr * ACTIVITY_MULTIPLIERS.get(activity_level, 1.55))
+
+def _derive_targets(weight, height, age, gender, activity_level, goal):
+    bmr = calculate_bmr(weight, height, age, gender)
+    daily_calories = calculate_daily_calories(bmr, activity_level)
+    
+    if goal == "Lose Weight":
+        daily_calories = int(daily_calories * 0.8)
+    elif goal == "Gain Weight":
+        daily_calories = int(daily_calories * 1.2)
+    
+    daily_protein = weight * 2.2
+    daily_fat = daily_calories * 0.25 / 9
+    daily_carbs = (daily_calories - (daily_protein * 4) - (daily_fat * 9)) / 4
+    
+    height_m = height / 100
+    bmi = weight / (height_m ** 2)
+    
+    if bmi < 18.5:
+        bmi_band = "Underweight"
+    elif bmi < 25:
+        bmi_band = "Normal weight"
+    elif bmi < 30:
+        bmi_band = "Overweight"
+    else:
+        bmi_band = "Obese"
+    
+    return {
+        'bmr': bmr,
+        'daily_calories': daily_calories,
+        'daily_protein': daily_protein,
+        'daily_carbs': daily_carbs,
+        'daily_fat': daily_fat,
+        'bmi': bmi,
+        'bmi_band': bmi_band
     }
-    return int(bmr * activity_multipliers.get(activity_level, 1.55))
 
 def validate_serving_size(serving_size):
     try:
@@ -256,31 +427,74 @@ def validate_serving_size(serving_size):
     except ValueError:
         raise InvalidServingSizeError("Please enter a valid number for serving size")
 
-def create_nutrition_pie_chart(nutrition_data):
-    macros = ['Protein', 'Carbs', 'Fat']
-    values = [nutrition_data['protein'] * 4, nutrition_data['carbs'] * 4, nutrition_data['fat'] * 9]
-    colors = ['#FF6B6B', '#4ECDC4', '#45B7D1']
-    
-    fig = go.Figure(data=[go.Pie(
-        labels=macros,
-        values=values,
-        hole=0.4,
-        marker_colors=colors,
-        textinfo='label+percent',
-        textfont_size=12,
-        hovertemplate='<b>%{label}</b><br>Calories: %{value:.0f}<br>Percentage: %{percent}<extra></extra>'
-    )])
+_MACRO_COLORS = ['#FF6B6B', '#4ECDC4', '#45B7D1']
+
+_DAILY_PIE_TRACE = dict(
+    type='pie',
+    labels=['Protein', 'Carbs', 'Fat'],
+    hole=0.4,
+    marker=dict(colors=_MACRO_COLORS),
+    textinfo='label+percent',
+    textfont=dict(size=12),
+    hovertemplate='<b>%{label}</b><br>Calories: %{value:.0f}<br>Percentage: %{percent}<extra></extra>'
+)
+
+_DAILY_PIE_LAYOUT = dict(
+    title=dict(text="Daily Macronutrient Distribution (Calories)"),
+    font=dict(size=14),
+    showlegend=True,
+    height=400
+)
+
+_SERVING_PIE_TRACE = dict(
+    type='pie',
+    labels=['Protein (cal)', 'Carbs (cal)', 'Fat (cal)'],
+    hole=0.3,
+    marker=dict(colors=_MACRO_COLORS)
+)
+
+_CAL_COEF = np.array([4.0, 4.0, 9.0], dtype=np.float32)
+
+def _macro_calories(nutrition_row):
+    return (nutrition_row[PROTEIN:FAT + 1] * _CAL_COEF).tolist()
+
+def create_nutrition_pie_chart(nutrition_row):
+    import plotly.graph_objects as go
     
-    fig.update_layout(
-        title="Daily Macronutrient Distribution (Calories)",
-        font=dict(size=14),
-        showlegend=True,
-        height=400
+    return go.Figure(
+        data=[dict(_DAILY_PIE_TRACE, values=_macro_calories(nutrition_row))],
+        layout=_DAILY_PIE_LAYOUT,
+        _validate=False
     )
-    
-    return fig
+
+def create_serving_pie_chart(nutrition_row):
+    import plotly.graph_objects as go
+    
+    return go.Figure(
+        data=[dict(_SERVING_PIE_TRACE, values=_macro_calories(nutrition_row))],
+        layout=dict(
+            title=dict(text=f"Macronutrient Breakdown ({nutrition_row[CALORIES]:.0f} total calories)"),
+            height=300,
+            showlegend=True
+        ),
+        _validate=False
+    )
+
+def render_target_progress(rows):
+    blocks = []
+    for label, current, target in rows:
+        percentage = (current / target) * 100
+        blocks.append(
+            f'<div class="target-progress">'
+            f'<div class="target-progress-track"><div class="target-progress-fill" style="width: {min(percentage, 100):.1f}%"></div></div>'
+            f'<div class="target-progress-caption">{label}: {percentage:.1f}% of target</div>'
+            f'</div>'
+        )
+    st.markdown("".join(blocks), unsafe_allow_html=True)
 
 def create_progress_bars(current, target, label):
+    import plotly.graph_objects as go
+    
     percentage = min((current / target * 100) if target > 0 else 0, 100)
     
     fig = go.Figure(go.Indicator(
@@ -304,22 +518,23 @@ def create_progress_bars(current, target, label):
     fig.update_layout(height=250)
     return fig
 
-def create_weekly_trend_chart(daily_entries):
+def create_weekly_trend_chart(daily_entries, target_calories):
     if not daily_entries:
         return None
     
-    dates = []
-    calories = []
+    today = datetime.now().date()
+    dates = pd.date_range(end=today, periods=7).strftime("%Y-%m-%d").to_numpy(dtype="U10")
+    calories = np.zeros(7, dtype=np.float32)
     
-    for i in range(6, -1, -1):
-        date_key = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        dates.append(date_key)
-        
-        if date_key in daily_entries:
-            daily_cal = sum(entry['nutrition']['calories'] for entry in daily_entries[date_key])
-            calories.append(daily_cal)
-        else:
-            calories.append(0)
+    for i, date_key in enumerate(dates):
+        log = daily_entries.get(date_key)
+        if log is not None:
+            calories[i] = log.nutrition[:, CALORIES].sum()
+    
+    return build_weekly_trend_figure(dates, calories, target_calories)
+
+def build_weekly_trend_figure(dates, calories, target_calories):
+    import plotly.graph_objects as go
     
     fig = go.Figure()
     
@@ -333,7 +548,7 @@ def create_weekly_trend_chart(daily_entries):
     ))
     
     fig.add_hline(
-        y=st.session_state.user_profile['daily_calories'], 
+        y=target_calories, 
         line_dash="dash", 
         line_color="green",
         annotation_text="Target Calories"
@@ -349,6 +564,83 @@ def create_weekly_trend_chart(daily_entries):
     
     return fig
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def build_trend_figure(dates, calories, protein, carbs, fat, targets):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    target_calories, target_protein, target_carbs, target_fat = targets
+    
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Calories', 'Protein (g)', 'Carbohydrates (g)', 'Fat (g)'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    fig.add_trace(
+        go.Scatter(x=dates, 
+                  y=calories,
+                  name='Calories',
+                  line=dict(color='#FF6B6B', width=2)),
+        row=1, col=1
+    )
+    fig.add_hline(y=target_calories, 
+                  line_dash="dash", line_color="red", row=1, col=1)
+    
+    fig.add_trace(
+        go.Scatter(x=dates, 
+                  y=protein,
+                  name='Protein',
+                  line=dict(color='#4ECDC4', width=2)),
+        row=1, col=2
+    )
+    fig.add_hline(y=target_protein, 
+                  line_dash="dash", line_color="green", row=1, col=2)
+    
+    fig.add_trace(
+        go.Scatter(x=dates, 
+                  y=carbs,
+                  name='Carbs',
+                  line=dict(color='#45B7D1', width=2)),
+        row=2, col=1
+    )
+    fig.add_hline(y=target_carbs, 
+                  line_dash="dash", line_color="blue", row=2, col=1)
+    
+    fig.add_trace(
+        go.Scatter(x=dates, 
+                  y=fat,
+                  name='Fat',
+                  line=dict(color='#96CEB4', width=2)),
+        row=2, col=2
+    )
+    fig.add_hline(y=target_fat, 
+                  line_dash="dash", line_color="orange", row=2, col=2)
+    
+    fig.update_layout(height=600, showlegend=False, title_text="Nutrition Trends Over Time")
+    
+    return fig
+
+def build_category_pie(labels, calories, counts):
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=[go.Pie(
+        labels=labels,
+        values=calories,
+        textinfo='label+percent+value',
+        texttemplate='%{label}<br>%{value:.0f} cal<br>%{percent}',
+        hovertemplate='<b>%{label}</b><br>Calories: %{value:.0f}<br>Percentage: %{percent}<br>Frequency: %{customdata}<extra></extra>',
+        customdata=counts
+    )])
+    
+    fig.update_layout(
+        title="Calories by Food Category",
+        height=500
+    )
+    
+    return fig
+
 def main():
     initialize_session_state()
     
@@ -368,8 +660,7 @@ def main():
         
         today = datetime.now().strftime("%Y-%m-%d")
         if today in st.session_state.daily_entries:
-            today_entries = st.session_state.daily_entries[today]
-            total_calories = sum(entry['nutrition']['calories'] for entry in today_entries)
+            total_calories = _today_totals()[0]
             st.metric("Today's Calories", f"{total_calories:.0f}")
             st.metric("Target Calories", f"{st.session_state.user_profile['daily_calories']}")
             
@@ -402,42 +693,37 @@ def show_dashboard():
     col1, col2, col3, col4 = st.columns(4)
     
     if today in st.session_state.daily_entries:
-        today_entries = st.session_state.daily_entries[today]
+        today_log = st.session_state.daily_entries[today]
         
-        total_nutrition = {
-            'calories': sum(entry['nutrition']['calories'] for entry in today_entries),
-            'protein': sum(entry['nutrition']['protein'] for entry in today_entries),
-            'carbs': sum(entry['nutrition']['carbs'] for entry in today_entries),
-            'fat': sum(entry['nutrition']['fat'] for entry in today_entries),
-            'fiber': sum(entry['nutrition']['fiber'] for entry in today_entries)
-        }
+        total_nutrition = _today_totals()
+        total_calories, total_protein, total_carbs, total_fat = total_nutrition[:4]
         
         with col1:
             st.metric(
                 "🔥 Calories", 
-                f"{total_nutrition['calories']:.0f}",
-                f"{total_nutrition['calories'] - st.session_state.user_profile['daily_calories']:.0f}"
+                f"{total_calories:.0f}",
+                f"{total_calories - st.session_state.user_profile['daily_calories']:.0f}"
             )
         
         with col2:
             st.metric(
                 "🥩 Protein", 
-                f"{total_nutrition['protein']:.1f}g",
-                f"{total_nutrition['protein'] - st.session_state.user_profile['daily_protein']:.1f}g"
+                f"{total_protein:.1f}g",
+                f"{total_protein - st.session_state.user_profile['daily_protein']:.1f}g"
             )
         
         with col3:
             st.metric(
                 "🍞 Carbs", 
-                f"{total_nutrition['carbs']:.1f}g",
-                f"{total_nutrition['carbs'] - st.session_state.user_profile['daily_carbs']:.1f}g"
+                f"{total_carbs:.1f}g",
+                f"{total_carbs - st.session_state.user_profile['daily_carbs']:.1f}g"
             )
         
         with col4:
             st.metric(
                 "🥑 Fat", 
-                f"{total_nutrition['fat']:.1f}g",
-                f"{total_nutrition['fat'] - st.session_state.user_profile['daily_fat']:.1f}g"
+                f"{total_fat:.1f}g",
+                f"{total_fat - st.session_state.user_profile['daily_fat']:.1f}g"
             )
         
         st.subheader("📈 Daily Progress")
@@ -445,7 +731,7 @@ def show_dashboard():
         progress_col1, progress_col2 = st.columns(2)
         
         with progress_col1:
-            if total_nutrition['calories'] > 0:
+            if total_calories > 0:
                 fig_pie = create_nutrition_pie_chart(total_nutrition)
                 st.plotly_chart(fig_pie, use_container_width=True)
             else:
@@ -454,51 +740,15 @@ def show_dashboard():
         with progress_col2:
             st.subheader("🎯 Target Progress")
             
-            calorie_progress = (total_nutrition['calories'] / st.session_state.user_profile['daily_calories']) * 100
-            st.progress(min(calorie_progress / 100, 1.0))
-            st.caption(f"Calories: {calorie_progress:.1f}% of target")
-            
-            protein_progress = (total_nutrition['protein'] / st.session_state.user_profile['daily_protein']) * 100
-            st.progress(min(protein_progress / 100, 1.0))
-            st.caption(f"Protein: {protein_progress:.1f}% of target")
-            
-            carbs_progress = (total_nutrition['carbs'] / st.session_state.user_profile['daily_carbs']) * 100
-            st.progress(min(carbs_progress / 100, 1.0))
-            st.caption(f"Carbs: {carbs_progress:.1f}% of target")
-            
-            fat_progress = (total_nutrition['fat'] / st.session_state.user_profile['daily_fat']) * 100
-            st.progress(min(fat_progress / 100, 1.0))
-            st.caption(f"Fat: {fat_progress:.1f}% of target")
-        
-        st.subheader("🍽️ Today's Food Log")
-        
-        if today_entries:
-            food_df = pd.DataFrame([
-                {
-                    'Time': entry['time'],
-                    'Food': entry['food_name'],
-                    'Serving (g)': entry['serving_size'],
-                    'Calories': f"{entry['nutrition']['calories']:.0f}",
-                    'Protein (g)': f"{entry['nutrition']['protein']:.1f}",
-                    'Carbs (g)': f"{entry['nutrition']['carbs']:.1f}",
-                    'Fat (g)': f"{entry['nutrition']['fat']:.1f}"
-                }
-                for entry in today_entries
+            render_target_progress([
+                ("Calories", total_calories, st.session_state.user_profile['daily_calories']),
+                ("Protein", total_protein, st.session_state.user_profile['daily_protein']),
+                ("Carbs", total_carbs, st.session_state.user_profile['daily_carbs']),
+                ("Fat", total_fat, st.session_state.user_profile['daily_fat'])
             ])
-            
-            st.dataframe(food_df, use_container_width=True)
-            
-            if st.checkbox("🗑️ Enable entry removal"):
-                entry_to_remove = st.selectbox(
-                    "Select entry to remove:",
-                    range(len(today_entries)),
-                    format_func=lambda i: f"{today_entries[i]['time']} - {today_entries[i]['food_name']}"
-                )
-                
-                if st.button("Remove Entry", type="secondary"):
-                    del st.session_state.daily_entries[today][entry_to_remove]
-                    st.rerun()
         
+        _food_log_fragment(today, today_log)
+    
     else:
         st.info("🌅 No food entries for today yet! Start by adding your first meal.")
         with col1:
@@ -511,14 +761,54 @@ def show_dashboard():
             st.metric("🥑 Fat", "0g", "0g")
     
     st.subheader("📅 Weekly Calorie Trend")
-    weekly_chart = create_weekly_trend_chart(st.session_state.daily_entries)
+    weekly_chart = create_weekly_trend_chart(st.session_state.daily_entries,
+                                             st.session_state.user_profile['daily_calories'])
     if weekly_chart:
         st.plotly_chart(weekly_chart, use_container_width=True)
     else:
         st.info("Start logging food to see your weekly trends!")
 
+@st.fragment
+def _food_log_fragment(today, today_log):
+    st.subheader("🍽️ Today's Food Log")
+    
+    if today_log:
+        food_df = _food_log_df(today, today_log)
+        
+        st.dataframe(
+            food_df,
+            column_config={
+                'Serving (g)': st.column_config.NumberColumn(format="%.1f"),
+                'Calories': st.column_config.NumberColumn(format="%.0f"),
+                'Protein (g)': st.column_config.NumberColumn(format="%.1f"),
+                'Carbs (g)': st.column_config.NumberColumn(format="%.1f"),
+                'Fat (g)': st.column_config.NumberColumn(format="%.1f")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        if st.checkbox("🗑️ Enable entry removal"):
+            entry_to_remove = st.selectbox(
+                "Select entry to remove:",
+                range(len(today_log)),
+                format_func=lambda i: f"{today_log.time[i]} - {today_log.food_name[i]}"
+            )
+            
+            if st.button("Remove Entry", type="secondary"):
+                today_log.remove(entry_to_remove)
+                st.session_state.entries_version += 1
+                st.rerun()
+
 def show_food_entry():
     st.header("🍽️ Food Entry")
+    _food_entry_fragment()
+
+@st.fragment
+def _food_entry_fragment():
+    notice = st.session_state.pop('_food_entry_notice', None)
+    if notice:
+        st.success(notice)
     
     col1, col2 = st.columns([2, 1])
     
@@ -527,18 +817,19 @@ def show_food_entry():
         
         search_term = st.text_input("Search for food:", placeholder="Type food name...")
         
-        categories = list(set(food.get_category() for food in st.session_state.food_database.values()))
-        selected_category = st.selectbox("Filter by category:", ["All"] + categories)
+        food_index = st.session_state.food_index
+        selected_category = st.selectbox("Filter by category:", ["All"] + list(CATEGORIES))
         
-        filtered_foods = {}
-        for name, food in st.session_state.food_database.items():
-            if search_term.lower() in name.lower() or not search_term:
-                if selected_category == "All" or food.get_category() == selected_category:
-                    filtered_foods[name] = food
+        mask = np.ones(len(food_index), dtype=bool)
+        if search_term:
+            mask &= food_index['name_lc'].str.contains(search_term.lower(), regex=False).to_numpy()
+        if selected_category != "All":
+            mask &= (food_index['category'] == selected_category).to_numpy()
+        filtered_names = food_index['name'][mask].tolist()
         
-        if filtered_foods:
-            selected_food_name = st.selectbox("Select food:", list(filtered_foods.keys()))
-            selected_food = filtered_foods[selected_food_name]
+        if filtered_names:
+            selected_food_name = st.selectbox("Select food:", filtered_names)
+            selected_food = st.session_state.food_database[selected_food_name]
         else:
             st.warning("No foods found matching your criteria.")
             selected_food = None
@@ -546,7 +837,7 @@ def show_food_entry():
     with col2:
         if selected_food:
             st.subheader("📋 Food Information")
-            st.write(f"**Category:** {selected_food.get_category()}")
+            st.write(f"**Category:** {selected_food.category}")
             st.write(f"**Calories per 100g:** {selected_food.calories_per_100g}")
             st.write(f"**Protein:** {selected_food.protein}g")
             st.write(f"**Carbs:** {selected_food.carbs}g")
@@ -582,35 +873,24 @@ def show_food_entry():
             st.subheader("🧮 Nutrition Calculation")
             
             try:
-                nutrition = selected_food.calculate_nutrition(serving_size)
+                nutrition = Nutrition._make(
+                    nutrition_for(st.session_state.food_ids[selected_food_name], serving_size).tolist()
+                )
                 
                 nutrition_col1, nutrition_col2 = st.columns(2)
                 
                 with nutrition_col1:
-                    st.metric("🔥 Calories", f"{nutrition['calories']:.0f}")
-                    st.metric("🥩 Protein", f"{nutrition['protein']:.1f}g")
-                    st.metric("🍞 Carbohydrates", f"{nutrition['carbs']:.1f}g")
+                    st.metric("🔥 Calories", f"{nutrition.calories:.0f}")
+                    st.metric("🥩 Protein", f"{nutrition.protein:.1f}g")
+                    st.metric("🍞 Carbohydrates", f"{nutrition.carbs:.1f}g")
                 
                 with nutrition_col2:
-                    st.metric("🥑 Fat", f"{nutrition['fat']:.1f}g")
-                    st.metric("🌾 Fiber", f"{nutrition['fiber']:.1f}g")
-                    st.metric("🍯 Sugar", f"{nutrition['sugar']:.1f}g")
+                    st.metric("🥑 Fat", f"{nutrition.fat:.1f}g")
+                    st.metric("🌾 Fiber", f"{nutrition.fiber:.1f}g")
+                    st.metric("🍯 Sugar", f"{nutrition.sugar:.1f}g")
                 
-                if nutrition['calories'] > 0:
-                    fig = go.Figure(data=[go.Pie(
-                        labels=['Protein (cal)', 'Carbs (cal)', 'Fat (cal)'],
-                        values=[nutrition['protein']*4, nutrition['carbs']*4, nutrition['fat']*9],
-                        hole=0.3,
-                        marker_colors=['#FF6B6B', '#4ECDC4', '#45B7D1']
-                    )])
-                    
-                    fig.update_layout(
-                        title=f"Macronutrient Breakdown ({nutrition['calories']:.0f} total calories)",
-                        height=300,
-                        showlegend=True
-                    )
-                    
-                    st.plotly_chart(fig, use_container_width=True)
+                if nutrition.calories > 0:
+                    st.plotly_chart(create_serving_pie_chart(nutrition), use_container_width=True)
                 
             except Exception as e:
                 st.error(f"Error calculating nutrition: {str(e)}")
@@ -627,19 +907,19 @@ def show_food_entry():
                     today = datetime.now().strftime("%Y-%m-%d")
                     
                     if today not in st.session_state.daily_entries:
-                        st.session_state.daily_entries[today] = []
+                        st.session_state.daily_entries[today] = DailyLog()
                     
-                    entry = {
-                        'time': custom_time.strftime("%H:%M"),
-                        'meal': meal_time,
-                        'food_name': selected_food_name,
-                        'serving_size': serving_size,
-                        'nutrition': nutrition
-                    }
-                    
-                    st.session_state.daily_entries[today].append(entry)
+                    st.session_state.daily_entries[today].append(
+                        custom_time.strftime("%H:%M"),
+                        meal_time,
+                        selected_food_name,
+                        serving_size,
+                        nutrition
+                    )
+                    st.session_state.entries_version += 1
                     
-                    st.success(f"✅ Added {selected_food_name} to your food log!")
+                    st.session_state['_food_entry_notice'] = f"✅ Added {selected_food_name} to your food log!"
+                    st.rerun()
                     
                 except InvalidServingSizeError as e:
                     st.error(f"❌ {str(e)}")
@@ -669,8 +949,8 @@ def show_profile():
         
         activity_level = st.selectbox(
             "Activity Level:",
-            ["Sedentary", "Light", "Moderate", "Active", "Very Active"],
-            index=["Sedentary", "Light", "Moderate", "Active", "Very Active"].index(st.session_state.user_profile['activity_level'])
+            list(ACTIVITY_MULTIPLIERS),
+            index=list(ACTIVITY_MULTIPLIERS).index(st.session_state.user_profile['activity_level'])
         )
         
         goal = st.selectbox(
@@ -682,17 +962,12 @@ def show_profile():
     with col2:
         st.subheader("🎯 Calculated Targets")
         
-        bmr = calculate_bmr(weight, height, age, gender)
-        daily_calories = calculate_daily_calories(bmr, activity_level)
-        
-        if goal == "Lose Weight":
-            daily_calories = int(daily_calories * 0.8)
-        elif goal == "Gain Weight":
-            daily_calories = int(daily_calories * 1.2)
-        
-        daily_protein = weight * 2.2
-        daily_fat = daily_calories * 0.25 / 9
-        daily_carbs = (daily_calories - (daily_protein * 4) - (daily_fat * 9)) / 4
+        targets = _derive_targets(weight, height, age, gender, activity_level, goal)
+        bmr = targets['bmr']
+        daily_calories = targets['daily_calories']
+        daily_protein = targets['daily_protein']
+        daily_carbs = targets['daily_carbs']
+        daily_fat = targets['daily_fat']
         
         st.metric("🔥 BMR", f"{bmr:.0f} calories")
         st.metric("📊 Daily Calories", f"{daily_calories} calories")
@@ -700,18 +975,15 @@ def show_profile():
         st.metric("🍞 Carbs Target", f"{daily_carbs:.0f}g")
         st.metric("🥑 Fat Target", f"{daily_fat:.0f}g")
         
-        height_m = height / 100
-        bmi = weight / (height_m ** 2)
-        
         st.markdown("---")
         st.subheader("📏 Body Mass Index")
-        st.metric("BMI", f"{bmi:.1f}")
+        st.metric("BMI", f"{targets['bmi']:.1f}")
         
-        if bmi < 18.5:
+        if targets['bmi_band'] == "Underweight":
             st.warning("⚠️ Underweight")
-        elif 18.5 <= bmi < 25:
+        elif targets['bmi_band'] == "Normal weight":
             st.success("✅ Normal weight")
-        elif 25 <= bmi < 30:
+        elif targets['bmi_band'] == "Overweight":
             st.warning("⚠️ Overweight")
         else:
             st.error("🚨 Obese")
@@ -739,6 +1011,10 @@ def show_analytics():
         st.info("📊 No data available yet. Start logging food to see analytics!")
         return
     
+    _analytics_fragment()
+
+@st.fragment
+def _analytics_fragment():
     col1, col2 = st.columns(2)
     with col1:
         start_date = st.date_input("Start Date:", 
@@ -747,129 +1023,74 @@ def show_analytics():
         end_date = st.date_input("End Date:", 
                                 value=datetime.now())
     
-    filtered_entries = {}
-    for date_str, entries in st.session_state.daily_entries.items():
-        entry_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        if start_date <= entry_date <= end_date:
-            filtered_entries[date_str] = entries
+    keys = np.array(list(st.session_state.daily_entries), dtype=object)
+    entry_dates = pd.to_datetime(keys, format="%Y-%m-%d", cache=True).date
+    mask = (entry_dates >= start_date) & (entry_dates <= end_date)
+    filtered_entries = {k: st.session_state.daily_entries[k] for k in keys[mask]}
     
     if not filtered_entries:
         st.warning("No data found for the selected date range.")
         return
     
-    daily_totals = {}
-    for date_str, entries in filtered_entries.items():
-        daily_totals[date_str] = {
-            'calories': sum(entry['nutrition']['calories'] for entry in entries),
-            'protein': sum(entry['nutrition']['protein'] for entry in entries),
-            'carbs': sum(entry['nutrition']['carbs'] for entry in entries),
-            'fat': sum(entry['nutrition']['fat'] for entry in entries),
-            'fiber': sum(entry['nutrition']['fiber'] for entry in entries)
-        }
-    
-    st.subheader("📊 Daily Trends")
-    
-    dates = list(daily_totals.keys())
-    dates.sort()
-    
-    fig = make_subplots(
-        rows=2, cols=2,
-        subplot_titles=('Calories', 'Protein (g)', 'Carbohydrates (g)', 'Fat (g)'),
-        specs=[[{"secondary_y": False}, {"secondary_y": False}],
-               [{"secondary_y": False}, {"secondary_y": False}]]
+    dates = tuple(sorted(filtered_entries))
+    profile = st.session_state.user_profile
+    totals = compute_daily_totals(
+        st.session_state.session_key,
+        st.session_state.entries_version,
+        dates,
+        [filtered_entries[d] for d in dates]
     )
     
-    fig.add_trace(
-        go.Scatter(x=dates, 
-                  y=[daily_totals[d]['calories'] for d in dates],
-                  name='Calories',
-                  line=dict(color='#FF6B6B', width=2)),
-        row=1, col=1
-    )
-    fig.add_hline(y=st.session_state.user_profile['daily_calories'], 
-                  line_dash="dash", line_color="red", row=1, col=1)
-    
-    fig.add_trace(
-        go.Scatter(x=dates, 
-                  y=[daily_totals[d]['protein'] for d in dates],
-                  name='Protein',
-                  line=dict(color='#4ECDC4', width=2)),
-        row=1, col=2
-    )
-    fig.add_hline(y=st.session_state.user_profile['daily_protein'], 
-                  line_dash="dash", line_color="green", row=1, col=2)
-    
-    fig.add_trace(
-        go.Scatter(x=dates, 
-                  y=[daily_totals[d]['carbs'] for d in dates],
-                  name='Carbs',
-                  line=dict(color='#45B7D1', width=2)),
-        row=2, col=1
-    )
-    fig.add_hline(y=st.session_state.user_profile['daily_carbs'], 
-                  line_dash="dash", line_color="blue", row=2, col=1)
+    st.subheader("📊 Daily Trends")
     
-    fig.add_trace(
-        go.Scatter(x=dates, 
-                  y=[daily_totals[d]['fat'] for d in dates],
-                  name='Fat',
-                  line=dict(color='#96CEB4', width=2)),
-        row=2, col=2
+    fig = build_trend_figure(
+        dates,
+        totals['calories'].to_numpy(),
+        totals['protein'].to_numpy(),
+        totals['carbs'].to_numpy(),
+        totals['fat'].to_numpy(),
+        (profile['daily_calories'], profile['daily_protein'], profile['daily_carbs'], profile['daily_fat'])
     )
-    fig.add_hline(y=st.session_state.user_profile['daily_fat'], 
-                  line_dash="dash", line_color="orange", row=2, col=2)
-    
-    fig.update_layout(height=600, showlegend=False, title_text="Nutrition Trends Over Time")
     st.plotly_chart(fig, use_container_width=True)
     
     st.subheader("📋 Period Summary")
     
     col1, col2, col3, col4 = st.columns(4)
     
-    avg_calories = np.mean([daily_totals[d]['calories'] for d in dates])
-    avg_protein = np.mean([daily_totals[d]['protein'] for d in dates])
-    avg_carbs = np.mean([daily_totals[d]['carbs'] for d in dates])
-    avg_fat = np.mean([daily_totals[d]['fat'] for d in dates])
+    avg_calories, avg_protein, avg_carbs, avg_fat = totals[['calories', 'protein', 'carbs', 'fat']].mean().to_numpy()
     
     with col1:
         st.metric("📊 Avg Calories", f"{avg_calories:.0f}",
-                 f"{avg_calories - st.session_state.user_profile['daily_calories']:.0f}")
+                 f"{avg_calories - profile['daily_calories']:.0f}")
     with col2:
         st.metric("🥩 Avg Protein", f"{avg_protein:.1f}g",
-                 f"{avg_protein - st.session_state.user_profile['daily_protein']:.1f}g")
+                 f"{avg_protein - profile['daily_protein']:.1f}g")
     with col3:
         st.metric("🍞 Avg Carbs", f"{avg_carbs:.1f}g",
-                 f"{avg_carbs - st.session_state.user_profile['daily_carbs']:.1f}g")
+                 f"{avg_carbs - profile['daily_carbs']:.1f}g")
     with col4:
         st.metric("🥑 Avg Fat", f"{avg_fat:.1f}g",
-                 f"{avg_fat - st.session_state.user_profile['daily_fat']:.1f}g")
+                 f"{avg_fat - profile['daily_fat']:.1f}g")
     
     st.subheader("🍎 Food Category Analysis")
     
-    category_totals = {}
-    for entries in filtered_entries.values():
-        for entry in entries:
-            food_name = entry['food_name']
-            if food_name in st.session_state.food_database:
-                category = st.session_state.food_database[food_name].get_category()
-                if category not in category_totals:
-                    category_totals[category] = {'calories': 0, 'count': 0}
-                category_totals[category]['calories'] += entry['nutrition']['calories']
-                category_totals[category]['count'] += 1
-    
-    if category_totals:
-        fig_cat = go.Figure(data=[go.Pie(
-            labels=list(category_totals.keys()),
-            values=[data['calories'] for data in category_totals.values()],
-            textinfo='label+percent+value',
-            texttemplate='%{label}<br>%{value:.0f} cal<br>%{percent}',
-            hovertemplate='<b>%{label}</b><br>Calories: %{value:.0f}<br>Percentage: %{percent}<br>Frequency: %{customdata}<extra></extra>',
-            customdata=[data['count'] for data in category_totals.values()]
-        )])
-        
-        fig_cat.update_layout(
-            title="Calories by Food Category",
-            height=500
+    category_map = food_category_map()
+    logs = filtered_entries.values()
+    category_totals = (
+        pd.DataFrame({
+            'category': pd.Series(np.concatenate([log.food_name for log in logs])).map(category_map),
+            'calories': np.concatenate([log.nutrition[:, CALORIES] for log in logs])
+        })
+        .dropna(subset=['category'])
+        .groupby('category', sort=False)['calories']
+        .agg(['sum', 'size'])
+    )
+    
+    if not category_totals.empty:
+        fig_cat = build_category_pie(
+            tuple(category_totals.index),
+            tuple(category_totals['sum'].tolist()),
+            tuple(category_totals['size'].tolist())
         )
         
         st.plotly_chart(fig_cat, use_container_width=True)
@@ -877,52 +1098,28 @@ def show_analytics():
 def show_goals():
     st.header("🎯 Goals & Achievements")
     
+    profile = st.session_state.user_profile
+    
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("🏆 Achievement Tracking")
         
         today = datetime.now().date()
-        streak = 0
+        daily_calories = np.full(30, np.nan)
+        keys = [(today - timedelta(days=i)).isoformat() for i in range(30)]
         
         for i in range(30):
-            check_date = (today - timedelta(days=i)).strftime("%Y-%m-%d")
-            if check_date in st.session_state.daily_entries:
-                entries = st.session_state.daily_entries[check_date]
-                daily_calories = sum(entry['nutrition']['calories'] for entry in entries)
-                target_calories = st.session_state.user_profile['daily_calories']
-                
-                if 0.9 * target_calories <= daily_calories <= 1.1 * target_calories:
-                    streak += 1
-                else:
-                    break
-            else:
-                break
+            log = st.session_state.daily_entries.get(keys[i])
+            if log is not None:
+                daily_calories[i] = log.nutrition[:, CALORIES].sum()
+        
+        streak = compute_streak(daily_calories, float(profile['daily_calories']))
         
         st.metric("🔥 Current Streak", f"{streak} days")
         
         st.subheader("📅 Weekly Goals")
-        
-        water_goal = st.session_state.weekly_goals['water_glasses']
-        water_current = st.number_input("Water glasses today:", min_value=0, max_value=20, value=0)
-        water_progress = min(water_current / water_goal, 1.0)
-        
-        st.progress(water_progress)
-        st.caption(f"💧 Water: {water_current}/{water_goal} glasses ({water_progress*100:.0f}%)")
-        
-        exercise_goal = st.session_state.weekly_goals['exercise_minutes']
-        exercise_current = st.number_input("Exercise minutes this week:", min_value=0, max_value=1000, value=0)
-        exercise_progress = min(exercise_current / exercise_goal, 1.0)
-        
-        st.progress(exercise_progress)
-        st.caption(f"💪 Exercise: {exercise_current}/{exercise_goal} minutes ({exercise_progress*100:.0f}%)")
-        
-        sleep_goal = st.session_state.weekly_goals['sleep_hours']
-        sleep_current = st.number_input("Sleep hours last night:", min_value=0.0, max_value=12.0, value=8.0, step=0.5)
-        sleep_progress = min(sleep_current / sleep_goal, 1.0)
-        
-        st.progress(sleep_progress)
-        st.caption(f"😴 Sleep: {sleep_current}/{sleep_goal} hours ({sleep_progress*100:.0f}%)")
+        _goals_input_fragment()
     
     with col2:
         st.subheader("🎖️ Badges & Milestones")
@@ -938,14 +1135,14 @@ def show_goals():
         
         today_str = datetime.now().strftime("%Y-%m-%d")
         if today_str in st.session_state.daily_entries:
-            today_entries = st.session_state.daily_entries[today_str]
-            total_protein = sum(entry['nutrition']['protein'] for entry in today_entries)
-            target_protein = st.session_state.user_profile['daily_protein']
+            today_totals = _today_totals()
+            total_protein = today_totals[PROTEIN]
+            target_protein = profile['daily_protein']
             
             if total_protein >= target_protein:
                 badges.append("🥩 Protein Power")
             
-            total_fiber = sum(entry['nutrition']['fiber'] for entry in today_entries)
+            total_fiber = today_totals[FIBER]
             if total_fiber >= 25:
                 badges.append("🌾 Fiber Champion")
         
@@ -958,9 +1155,10 @@ def show_goals():
         st.subheader("⚙️ Set New Goals")
         
         with st.expander("🎯 Customize Weekly Goals"):
-            new_water = st.slider("Daily water glasses:", 1, 15, water_goal)
-            new_exercise = st.slider("Weekly exercise minutes:", 30, 500, exercise_goal)
-            new_sleep = st.slider("Daily sleep hours:", 6, 12, sleep_goal)
+            weekly_goals = st.session_state.weekly_goals
+            new_water = st.slider("Daily water glasses:", 1, 15, weekly_goals['water_glasses'])
+            new_exercise = st.slider("Weekly exercise minutes:", 30, 500, weekly_goals['exercise_minutes'])
+            new_sleep = st.slider("Daily sleep hours:", 6, 12, weekly_goals['sleep_hours'])
             
             if st.button("💾 Save Goals"):
                 st.session_state.weekly_goals.update({
@@ -973,16 +1171,12 @@ def show_goals():
         st.subheader("💡 Insights")
         
         if len(st.session_state.daily_entries) >= 7:
-            recent_days = []
-            for i in range(7):
-                date_key = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-                if date_key in st.session_state.daily_entries:
-                    daily_cal = sum(entry['nutrition']['calories'] for entry in st.session_state.daily_entries[date_key])
-                    recent_days.append(daily_cal)
+            recent_days = daily_calories[:7]
+            recent_days = recent_days[~np.isnan(recent_days)]
             
-            if recent_days:
-                avg_weekly = np.mean(recent_days)
-                target = st.session_state.user_profile['daily_calories']
+            if recent_days.size:
+                avg_weekly = recent_days.mean()
+                target = profile['daily_calories']
                 
                 if avg_weekly < target * 0.9:
                     st.info("💡 You've been eating below your calorie target. Consider adding healthy snacks!")
@@ -991,6 +1185,30 @@ def show_goals():
                 else:
                     st.success("💡 Great job staying within your calorie targets! 🎉")
 
+@st.fragment
+def _goals_input_fragment():
+    water_goal = st.session_state.weekly_goals['water_glasses']
+    exercise_goal = st.session_state.weekly_goals['exercise_minutes']
+    sleep_goal = st.session_state.weekly_goals['sleep_hours']
+    
+    with st.form("daily_goals"):
+        water_current = st.number_input("Water glasses today:", min_value=0, max_value=20, value=0)
+        exercise_current = st.number_input("Exercise minutes this week:", min_value=0, max_value=1000, value=0)
+        sleep_current = st.number_input("Sleep hours last night:", min_value=0.0, max_value=12.0, value=8.0, step=0.5)
+        st.form_submit_button("Update progress")
+    
+    water_progress = min(water_current / water_goal, 1.0)
+    st.progress(water_progress)
+    st.caption(f"💧 Water: {water_current}/{water_goal} glasses ({water_progress*100:.0f}%)")
+    
+    exercise_progress = min(exercise_current / exercise_goal, 1.0)
+    st.progress(exercise_progress)
+    st.caption(f"💪 Exercise: {exercise_current}/{exercise_goal} minutes ({exercise_progress*100:.0f}%)")
+    
+    sleep_progress = min(sleep_current / sleep_goal, 1.0)
+    st.progress(sleep_progress)
+    st.caption(f"😴 Sleep: {sleep_current}/{sleep_goal} hours ({sleep_progress*100:.0f}%)")
+
 def show_settings():
     st.header("⚙️ Settings & Data Management")
     
@@ -1002,17 +1220,20 @@ def show_settings():
         if st.button("📤 Export All Data"):
             export_data = {
                 'user_profile': st.session_state.user_profile,
-                'daily_entries': st.session_state.daily_entries,
+                'daily_entries': {date_str: log.to_dict()
+                                  for date_str, log in st.session_state.daily_entries.items()},
                 'weekly_goals': st.session_state.weekly_goals,
                 'export_timestamp': datetime.now().isoformat()
             }
             
-            json_string = json.dumps(export_data, indent=2, default=str)
-            b64 = base64.b64encode(json_string.encode()).decode()
+            json_bytes = orjson.dumps(
+                export_data,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            )
             
             st.download_button(
                 label="💾 Download JSON File",
-                data=json_string,
+                data=json_bytes,
                 file_name=f"nutrition_data_{datetime.now().strftime('%Y%m%d')}.json",
                 mime="application/json"
             )
@@ -1024,13 +1245,17 @@ def show_settings():
         
         if uploaded_file is not None:
             try:
-                data = json.load(uploaded_file)
+                data = orjson.loads(uploaded_file.getvalue())
                 
                 if st.button("⚠️ Import Data (This will overwrite current data)"):
                     if 'user_profile' in data:
                         st.session_state.user_profile = data['user_profile']
                     if 'daily_entries' in data:
-                        st.session_state.daily_entries = data['daily_entries']
+                        st.session_state.daily_entries = {
+                            date_str: DailyLog.from_dict(log) if isinstance(log, dict) else DailyLog.from_records(log)
+                            for date_str, log in data['daily_entries'].items()
+                        }
+                        st.session_state.entries_version += 1
                     if 'weekly_goals' in data:
                         st.session_state.weekly_goals = data['weekly_goals']
                     
@@ -1045,6 +1270,7 @@ def show_settings():
         if st.checkbox("Enable data clearing (⚠️ Dangerous)"):
             if st.button("🗑️ Clear All Food Entries", type="secondary"):
                 st.session_state.daily_entries = {}
+                st.session_state.entries_version += 1
                 st.success("✅ Food entries cleared!")
                 st.rerun()
             
@@ -1069,9 +1295,7 @@ def show_settings():
         
         with st.expander("➕ Add Custom Food"):
             food_name = st.text_input("Food Name:")
-            food_category = st.selectbox("Category:", 
-                                       ["🍎 Fruits", "🥬 Vegetables", "🍗 Proteins", 
-                                        "🌾 Grains", "🥛 Dairy"])
+            food_category = st.selectbox("Category:", list(CATEGORIES))
             
             col_a, col_b = st.columns(2)
             with col_a:
@@ -1086,30 +1310,26 @@ def show_settings():
             
             if st.button("➕ Add Custom Food"):
                 if food_name and food_name not in st.session_state.food_database:
-                    if food_category == "🍎 Fruits":
-                        new_food = Fruit(food_name, calories, protein, carbs, fat, fiber, sugar)
-                    elif food_category == "🥬 Vegetables":
-                        new_food = Vegetable(food_name, calories, protein, carbs, fat, fiber, sugar)
-                    elif food_category == "🍗 Proteins":
-                        new_food = Protein(food_name, calories, protein, carbs, fat, fiber, sugar)
-                    elif food_category == "🌾 Grains":
-                        new_food = Grain(food_name, calories, protein, carbs, fat, fiber, sugar)
-                    else:
-                        new_food = Dairy(food_name, calories, protein, carbs, fat, fiber, sugar)
+                    new_food = FoodItem(food_name, food_category, calories, protein, carbs, fat, fiber, sugar)
                     
                     st.session_state.food_database[food_name] = new_food
+                    st.session_state.category_counts[food_category] += 1
+                    st.session_state.food_index = pd.concat(
+                        [st.session_state.food_index, create_food_index({food_name: new_food})],
+                        ignore_index=True
+                    )
+                    st.session_state.nutrition_matrix = np.vstack(
+                        [st.session_state.nutrition_matrix, create_nutrition_matrix({food_name: new_food})]
+                    )
+                    st.session_state.food_ids[food_name] = len(st.session_state.food_ids)
+                    st.session_state.db_version += 1
                     st.success(f"✅ Added {food_name} to database!")
                 else:
                     st.error("❌ Food name is required and must be unique!")
         
         st.subheader("📈 Database Statistics")
         
-        category_counts = {}
-        for food in st.session_state.food_database.values():
-            category = food.get_category()
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
-        for category, count in category_counts.items():
+        for category, count in st.session_state.category_counts.items():
             st.metric(category, count)
         
         st.info(f"📊 Total foods in database: {len(st.session_state.food_database)}")